@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
-import pgeocode
+import io
+import json
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pa_parquet
 
 # Page configuration
 st.set_page_config(
@@ -14,8 +19,48 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load data
-@st.cache_data
+# Upper bound for per-filter caches. Their keys include the continuous score
+# slider bounds, so unbounded caches would grow for the life of the process.
+CACHE_MAX_ENTRIES = 50
+
+# Parse-time dtypes for the scores CSV. Low-cardinality text columns are
+# compared and grouped throughout, and narrower numeric dtypes halve the bytes
+# every filter and chart reads. Only whole-number columns are narrowed: the
+# fractional percentages and scores stay float64 so the data table download
+# keeps the precision of the source CSV.
+CSV_COLUMN_TYPES = {
+    'zip_code': pa.int32(),
+    'primary_city': pa.dictionary(pa.int32(), pa.string()),
+    'score_category': pa.dictionary(pa.int32(), pa.string()),
+    'estimated_population': pa.int32(),
+    # Whole-dollar amounts, exact in float32
+    'median_income': pa.float32(),
+    'median_home_value': pa.float32(),
+    **{col: pa.float64() for col in [
+        'population_density', 'public_transit_pct', 'education_pct',
+        'density_score', 'transit_score', 'income_score',
+        'education_score', 'housing_score', 'composite_score'
+    ]}
+}
+
+def parquet_matches_column_types(parquet_path):
+    """Return whether a cached Parquet copy was written with CSV_COLUMN_TYPES"""
+    schema = pa_parquet.read_schema(parquet_path)
+    for name, expected in CSV_COLUMN_TYPES.items():
+        if name not in schema.names:
+            return False
+        actual = schema.field(name).type
+        if pa.types.is_dictionary(expected):
+            # The index width follows the category count, so only compare values
+            if not (pa.types.is_dictionary(actual) and
+                    (pa.types.is_string(actual.value_type) or
+                     pa.types.is_large_string(actual.value_type))):
+                return False
+        elif actual != expected:
+            return False
+    return True
+
+# Load data (cached by get_dashboard_data)
 def load_data():
     # Try multiple possible paths
     possible_paths = [
@@ -25,9 +70,36 @@ def load_data():
     ]
     
     for path in possible_paths:
-        if os.path.exists(path):
-            df = pd.read_csv(path)
-            return df
+        # Prefer the Parquet copy written on a previous cold start, unless the
+        # CSV is newer or the copy predates the current column types
+        parquet_path = os.path.splitext(path)[0] + '.parquet'
+        if os.path.exists(parquet_path) and (
+            not os.path.exists(path) or (
+                os.path.getmtime(parquet_path) >= os.path.getmtime(path)
+                and parquet_matches_column_types(parquet_path)
+            )
+        ):
+            df = pd.read_parquet(parquet_path)
+        elif os.path.exists(path):
+            # pyarrow's multithreaded parser applies the narrow dtypes in one pass
+            convert_options = pa_csv.ConvertOptions(column_types=CSV_COLUMN_TYPES)
+            df = pa_csv.read_csv(path, convert_options=convert_options).to_pandas()
+            # Dictionary columns arrive in first-seen order; sort them for the sidebar
+            for col in ['score_category', 'primary_city']:
+                df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+            # Parquet keeps the dtypes above, so later loads skip parsing entirely
+            try:
+                df.to_parquet(parquet_path, index=False)
+            except OSError:
+                pass
+        else:
+            continue
+        # Lowercased text searched by the data table, so one scan serves all fields.
+        # The NUL separator cannot be typed, so no search matches across fields.
+        df['__search'] = df['zip_code'].astype(str).str.cat(
+            [df['primary_city'].astype(str), df['score_category'].astype(str)], sep='\x00'
+        ).str.lower()
+        return df
     
     # If file not found, raise an error
     raise FileNotFoundError(
@@ -35,8 +107,20 @@ def load_data():
         "Please ensure the CSV file is in the same directory as app.py"
     )
 
+# Optional static zip code -> [latitude, longitude] table. It is not shipped;
+# build_zip_coords.py generates it, and it is used only once committed.
+ZIP_COORDS_FILE = 'la_zip_coords.json'
+
+def read_zip_coords_table(path):
+    """Read the static zip code coordinates table into a DataFrame"""
+    with open(path) as f:
+        table = json.load(f)
+    return pd.DataFrame(
+        [(int(zip_code), lat, lon) for zip_code, (lat, lon) in table.items()],
+        columns=['zip_code', 'latitude', 'longitude']
+    )
+
 # Get coordinates for zip codes
-@st.cache_data
 def get_coordinates(df):
     """Get latitude and longitude for zip codes"""
     # Check if coordinates already exist
@@ -46,30 +130,44 @@ def get_coordinates(df):
         df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
         return df
     
-    # Initialize geocoder (cached)
-    nomi = pgeocode.Nominatim('us')
-    
-    # Get unique zip codes to avoid duplicate lookups
     unique_zips = df['zip_code'].unique()
-    zip_coords = {}
-    
-    # Get coordinates for each unique zip code
-    for zip_code in unique_zips:
-        location = nomi.query_postal_code(str(int(zip_code)).zfill(5))
-        if pd.notna(location.latitude) and pd.notna(location.longitude):
-            zip_coords[zip_code] = {
-                'latitude': float(location.latitude),
-                'longitude': float(location.longitude)
-            }
-        else:
-            zip_coords[zip_code] = {
-                'latitude': None,
-                'longitude': None
-            }
-    
-    # Map coordinates back to dataframe
-    df['latitude'] = df['zip_code'].map(lambda x: zip_coords.get(x, {}).get('latitude'))
-    df['longitude'] = df['zip_code'].map(lambda x: zip_coords.get(x, {}).get('longitude'))
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    coords_path = os.path.join(app_dir, 'zip_coords.parquet')
+    
+    # Prefer the static lookup table shipped with the app, then coordinates
+    # saved by an earlier run, unless either is missing some of the zip codes
+    coord_df = None
+    for path, read_coords in [
+        (os.path.join(app_dir, ZIP_COORDS_FILE), read_zip_coords_table),
+        (coords_path, pd.read_parquet)
+    ]:
+        if os.path.exists(path):
+            coord_df = read_coords(path)
+            if np.isin(unique_zips, coord_df['zip_code'].values).all():
+                break
+            coord_df = None
+    
+    if coord_df is None:
+        # Imported here so runs that reuse saved coordinates skip its startup cost
+        import pgeocode
+        
+        # Initialize geocoder (cached)
+        nomi = pgeocode.Nominatim('us')
+        
+        # Look up all unique zip codes in one vectorized query
+        locations = nomi.query_postal_code([str(int(z)).zfill(5) for z in unique_zips])
+        coord_df = pd.DataFrame({
+            'zip_code': unique_zips,
+            'latitude': locations['latitude'].values,
+            'longitude': locations['longitude'].values
+        })
+        try:
+            coord_df.to_parquet(coords_path, index=False)
+        except OSError:
+            pass
+    
+    # Merge coordinates back to dataframe
+    df = df.merge(coord_df, on='zip_code', how='left')
     
     # Fill missing coordinates with approximate LA County center for visualization
     la_center_lat, la_center_lon = 34.0522, -118.2437
@@ -78,98 +176,302 @@ def get_coordinates(df):
     
     return df
 
-df = load_data()
-df = get_coordinates(df)
+# Shared, read-only dashboard data. cache_resource hands every rerun the same
+# frame, where cache_data would unpickle a fresh copy each time.
+@st.cache_resource
+def get_dashboard_data():
+    """Load the scores table with coordinates once per process"""
+    return get_coordinates(load_data())
 
-# Sidebar filters
-st.sidebar.header("🔍 Filters")
+@st.cache_data
+def get_sidebar_options(_df):
+    """Return the category and city choices and the composite score bounds.
 
-# Score category filter
-score_categories = ['All'] + sorted(df['score_category'].unique().tolist())
-selected_category = st.sidebar.selectbox("Score Category", score_categories)
+    Categories come straight from the categorical dtype, which keeps them
+    sorted, so no column is scanned for unique values.
+    """
+    return (
+        ['All'] + _df['score_category'].cat.categories.tolist(),
+        ['All'] + _df['primary_city'].cat.categories.tolist(),
+        float(_df['composite_score'].min()),
+        float(_df['composite_score'].max())
+    )
 
-# City filter
-cities = ['All'] + sorted(df['primary_city'].unique().tolist())
-selected_city = st.sidebar.selectbox("Primary City", cities)
+# Filter data by sidebar selections
+def get_filtered(_df, category, city, lo, hi):
+    """Return the rows matching the sidebar filters"""
+    scores = _df['composite_score'].values
+    mask = (scores >= lo) & (scores <= hi)
+    if category != 'All':
+        mask &= _df['score_category'].values == category
+    if city != 'All':
+        mask &= _df['primary_city'].values == city
+    if mask.all():
+        # Nothing filtered out; skip materializing an identical frame
+        return _df
+    return _df.iloc[mask]
 
-# Composite score range
-min_score = float(df['composite_score'].min())
-max_score = float(df['composite_score'].max())
-score_range = st.sidebar.slider(
-    "Composite Score Range",
-    min_value=min_score,
-    max_value=max_score,
-    value=(min_score, max_score)
+def top_k_rows(frame, col, cols, k=10, largest=True):
+    """Return the k rows with the largest (or smallest) values of a column"""
+    sub = frame[cols]
+    values = sub[col].values
+    if len(values) > k:
+        # Partial selection is O(N); only the k selected rows get sorted
+        idx = np.argpartition(-values if largest else values, k)[:k]
+        sub = sub.iloc[idx]
+    return sub.sort_values(col, ascending=not largest)
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES)
+def category_pie_fig(names, counts):
+    """Build the score category pie chart"""
+    fig = px.pie(
+        values=list(counts),
+        names=list(names),
+        title="Distribution by Score Category",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES)
+def hist_bins(_filtered, filter_args, col, nbins=30):
+    """Bin a column of the filtered data on the server"""
+    # Bin in float64: float32 cannot hold 30 bins inside the +/-0.5 range numpy
+    # uses when every value is the same (e.g. a single-zip city)
+    values = _filtered[col].dropna().values.astype(np.float64)
+    return np.histogram(values, bins=nbins)
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES)
+def hist_fig(counts, edges, title, x_label, color):
+    """Build a histogram figure from precomputed bin counts.
+
+    Figures are cached as shared resources, so callers must not modify them.
+    """
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=color,
+        # Show each bar's bin range on hover, as the client-side histogram did
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate=(
+            f'{x_label}: %{{customdata[0]:,.2f}} - %{{customdata[1]:,.2f}}<br>'
+            'Number of Zip Codes: %{y}<extra></extra>'
+        )
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title='Number of Zip Codes',
+        bargap=0
+    )
+    return fig
+
+# Component score columns shown in the score analysis
+SCORE_COLS = ['density_score', 'transit_score', 'income_score', 'education_score', 'housing_score']
+CORR_COLS = ['composite_score'] + SCORE_COLS
+
+# Columns averaged for the key metrics row
+METRIC_COLS = ['composite_score', 'median_income', 'median_home_value', 'estimated_population']
+# Columns listed for the top and bottom zip codes
+RANKING_COLS = ['zip_code', 'primary_city', 'composite_score', 'median_income', 'median_home_value']
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES)
+def filter_aggregates(_filtered, filter_args):
+    """Compute the summaries shared across views once per filter state.
+
+    Returns a plain dict so cache_data can pickle it without a custom class.
+    """
+    # Score categories counted from the categorical codes
+    categories = _filtered['score_category']
+    codes, counts = np.unique(categories.cat.codes.values, return_counts=True)
+    present = codes >= 0  # -1 marks missing values
+    # One float32 2D array feeds both score statistics
+    scores = _filtered[CORR_COLS].to_numpy(dtype=np.float32)
+    return {
+        'metric_means': _filtered[METRIC_COLS].mean(),
+        'city_means': _filtered.groupby('primary_city', observed=True, sort=False)[
+            ['median_income', 'median_home_value']
+        ].mean(),
+        'category_names': categories.cat.categories[codes[present]].tolist(),
+        'category_counts': counts[present],
+        'score_means': scores[:, 1:].mean(axis=0),
+        'score_corr': np.corrcoef(scores, rowvar=False, dtype=np.float32),
+        'top_10': top_k_rows(_filtered, 'composite_score', RANKING_COLS),
+        'bottom_10': top_k_rows(_filtered, 'composite_score', RANKING_COLS, largest=False)
+    }
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES)
+def describe_view(_view, filter_args, search_term, cols):
+    """Describe the numeric columns of a data table view.
+
+    The view is not hashed; it is identified by the filters, search term
+    and columns that produced it.
+    """
+    numeric = _view.select_dtypes(include='number')
+    if numeric.shape[1] == 0:
+        return None
+    return numeric.describe()
+
+# Only the last few downloads are kept: each entry holds a whole encoded
+# view, and a new one is created for every search term typed.
+@st.cache_data(max_entries=4)
+def view_csv_bytes(_view, filter_args, search_term, cols):
+    """Encode a data table view as CSV bytes with the pyarrow writer"""
+    buf = io.BytesIO()
+    pa_csv.write_csv(pa.Table.from_pandas(_view, preserve_index=False), buf)
+    return buf.getvalue()
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES)
+def score_component_figs(_filtered, filter_args):
+    """Build the component average bar chart and the score correlation heatmap"""
+    aggregates = filter_aggregates(_filtered, filter_args)
+    avg_scores = aggregates['score_means']
+    fig_bar = px.bar(
+        x=SCORE_COLS,
+        y=avg_scores,
+        title="Average Scores by Component",
+        labels={'x': 'Score Component', 'y': 'Average Score'},
+        color=avg_scores,
+        color_continuous_scale='Viridis'
+    )
+    fig_bar.update_layout(showlegend=False)
+    fig_heatmap = px.imshow(
+        aggregates['score_corr'],
+        labels=dict(color="Correlation"),
+        x=CORR_COLS,
+        y=CORR_COLS,
+        color_continuous_scale='RdBu',
+        aspect="auto",
+        title="Score Components Correlation Matrix"
+    )
+    return fig_bar, fig_heatmap
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES)
+def top_city_fig(_filtered, filter_args, col, title, x_label, color_scale):
+    """Build a horizontal bar chart of the 10 cities with the highest average of a column"""
+    top_cities = filter_aggregates(_filtered, filter_args)['city_means'][col].nlargest(10)
+    fig = px.bar(
+        x=top_cities.values,
+        y=top_cities.index,
+        orientation='h',
+        title=title,
+        labels={'x': x_label, 'y': 'City'},
+        color=top_cities.values,
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(showlegend=False)
+    return fig
+
+# Rows per page in the data table
+TABLE_PAGE_SIZE = 50
+
+# Map hover fields, referenced by position in MAP_HOVER_TEMPLATE
+MAP_HOVER_COLS = ['zip_code', 'primary_city', 'composite_score', 'score_category',
+                  'median_income', 'median_home_value', 'estimated_population']
+MAP_HOVER_TEMPLATE = (
+    '<b>Zip Code:</b> %{customdata[0]}<br>'
+    '<b>City:</b> %{customdata[1]}<br>'
+    '<b>Composite Score:</b> %{customdata[2]:.2f}<br>'
+    '<b>Score Category:</b> %{customdata[3]}<br>'
+    '<b>Median Income:</b> %{customdata[4]:$,.0f}<br>'
+    '<b>Home Value:</b> %{customdata[5]:$,.0f}<br>'
+    '<b>Population:</b> %{customdata[6]:,.0f}'
+    '<extra></extra>'
 )
 
-# Apply filters
-filtered_df = df.copy()
-if selected_category != 'All':
-    filtered_df = filtered_df[filtered_df['score_category'] == selected_category]
-if selected_city != 'All':
-    filtered_df = filtered_df[filtered_df['primary_city'] == selected_city]
-filtered_df = filtered_df[
-    (filtered_df['composite_score'] >= score_range[0]) &
-    (filtered_df['composite_score'] <= score_range[1])
-]
+# Above this many zip codes the map is rendered as a datashader image
+MAP_RASTER_MIN_POINTS = 2000
 
-# Main title
-st.title("🏙️ Los Angeles County Zip Code Analysis Dashboard")
-st.markdown("---")
+def raster_map_fig(map_df, color_col):
+    """Rasterize map points with datashader into a mapbox image layer.
 
-# Key Metrics
-col1, col2, col3, col4, col5 = st.columns(5)
-with col1:
-    st.metric("Total Zip Codes", len(filtered_df))
-with col2:
-    st.metric("Avg Composite Score", f"{filtered_df['composite_score'].mean():.2f}")
-with col3:
-    st.metric("Avg Median Income", f"${filtered_df['median_income'].mean():,.0f}")
-with col4:
-    st.metric("Avg Home Value", f"${filtered_df['median_home_value'].mean():,.0f}")
-with col5:
-    st.metric("Avg Population", f"{filtered_df['estimated_population'].mean():,.0f}")
+    Returns None when datashader is not installed, so the caller falls back
+    to drawing one marker per zip code.
+    """
+    try:
+        import datashader as ds
+        import datashader.transfer_functions as tf
+    except ImportError:
+        return None
+    
+    lon0, lon1 = float(map_df['longitude'].min()), float(map_df['longitude'].max())
+    lat0, lat1 = float(map_df['latitude'].min()), float(map_df['latitude'].max())
+    canvas = ds.Canvas(plot_width=800, plot_height=800, x_range=(lon0, lon1), y_range=(lat0, lat1))
+    if color_col == 'score_category':
+        agg = canvas.points(map_df, 'longitude', 'latitude', ds.by(color_col, ds.count()))
+        color_key = ['#%02x%02x%02x' % tuple(int(v) for v in px.colors.unlabel_rgb(c))
+                     for c in px.colors.qualitative.Set3]
+        img = tf.shade(agg, color_key=color_key)
+    else:
+        agg = canvas.points(map_df, 'longitude', 'latitude', ds.mean(color_col))
+        img = tf.shade(agg, cmap=px.colors.sequential.Viridis)
+    
+    fig = go.Figure(go.Scattermapbox(lat=[], lon=[]))
+    fig.update_layout(
+        title="LA County Zip Codes on California Map",
+        height=700,
+        mapbox_layers=[{
+            'sourcetype': 'image',
+            # to_pil() already puts the northern edge in the top row
+            'source': img.to_pil(),
+            'coordinates': [[lon0, lat1], [lon1, lat1], [lon1, lat0], [lon0, lat0]]
+        }]
+    )
+    return fig
 
-st.markdown("---")
+# Above this many points the scatters are gridded or subsampled
+SCATTER_MAX_POINTS = 5000
 
-# Tabs for different views
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-    "📊 Overview", 
-    "📈 Score Analysis", 
-    "💰 Economic Metrics", 
-    "🏘️ Demographics", 
-    "🗺️ Interactive Map",
-    "📋 Data Table"
-])
+def subsample(frame, n_max=SCATTER_MAX_POINTS):
+    """Return at most n_max rows, sampled reproducibly, for scatter plots"""
+    if len(frame) <= n_max:
+        return frame
+    return frame.sample(n_max, random_state=0)
+
+def scatter_points(frame, x, y, color, size, hover, bins=200):
+    """Return (data, size column, hover columns) for a scatter plot.
+
+    Large selections are collapsed onto a bins x bins grid with one marker
+    per occupied cell, sized by zip code count and colored by the mean.
+    """
+    if len(frame) <= SCATTER_MAX_POINTS:
+        return frame, size, hover
+    # Equal-width cells over each column's range, computed arithmetically
+    cell = np.zeros(len(frame), dtype=np.int64)
+    for col in (x, y):
+        values = frame[col].values.astype(np.float64)
+        lo, hi = values.min(), values.max()
+        idx = ((values - lo) * (bins / ((hi - lo) or 1))).astype(np.int64)
+        cell = cell * bins + np.minimum(idx, bins - 1)
+    cells = frame.groupby(cell, sort=False)
+    points = cells[[x, y, color]].mean()
+    points['zip_count'] = cells.size()
+    return points, 'zip_count', ['zip_count']
 
-with tab1:
+# View renderers; each is a fragment so its own widgets rerun only that view
+@st.fragment
+def render_overview(filtered_df, filter_args):
     st.header("Overview Analysis")
+    aggregates = filter_aggregates(filtered_df, filter_args)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Score category distribution
-        category_counts = filtered_df['score_category'].value_counts()
-        fig_pie = px.pie(
-            values=category_counts.values,
-            names=category_counts.index,
-            title="Distribution by Score Category",
-            color_discrete_sequence=px.colors.qualitative.Set3
+        fig_pie = category_pie_fig(
+            tuple(aggregates['category_names']), tuple(aggregates['category_counts'].tolist())
         )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
         st.plotly_chart(fig_pie, use_container_width=True)
     
     with col2:
         # Composite score distribution
-        fig_hist = px.histogram(
-            filtered_df,
-            x='composite_score',
-            nbins=30,
+        fig_hist = hist_fig(
+            *hist_bins(filtered_df, filter_args, 'composite_score'),
             title="Composite Score Distribution",
-            labels={'composite_score': 'Composite Score', 'count': 'Number of Zip Codes'},
-            color_discrete_sequence=['#1f77b4']
+            x_label='Composite Score',
+            color='#1f77b4'
         )
-        fig_hist.update_layout(showlegend=False)
         st.plotly_chart(fig_hist, use_container_width=True)
     
     # Top and bottom zip codes
@@ -177,58 +479,29 @@ with tab1:
     
     with col1:
         st.subheader("🏆 Top 10 Zip Codes by Composite Score")
-        top_10 = filtered_df.nlargest(10, 'composite_score')[
-            ['zip_code', 'primary_city', 'composite_score', 'median_income', 'median_home_value']
-        ]
-        top_10 = top_10.reset_index(drop=True)
-        top_10.index = top_10.index + 1
-        st.dataframe(top_10, use_container_width=True)
+        top_10 = aggregates['top_10']
+        top_10.insert(0, 'rank', np.arange(1, len(top_10) + 1))
+        st.dataframe(top_10, hide_index=True, use_container_width=True)
     
     with col2:
         st.subheader("📉 Bottom 10 Zip Codes by Composite Score")
-        bottom_10 = filtered_df.nsmallest(10, 'composite_score')[
-            ['zip_code', 'primary_city', 'composite_score', 'median_income', 'median_home_value']
-        ]
-        bottom_10 = bottom_10.reset_index(drop=True)
-        bottom_10.index = bottom_10.index + 1
-        st.dataframe(bottom_10, use_container_width=True)
-
-with tab2:
+        bottom_10 = aggregates['bottom_10']
+        bottom_10.insert(0, 'rank', np.arange(1, len(bottom_10) + 1))
+        st.dataframe(bottom_10, hide_index=True, use_container_width=True)
+
+@st.fragment
+def render_score_analysis(filtered_df, filter_args):
     st.header("Score Analysis")
     
     # Score components comparison
+    fig_bar, fig_heatmap = score_component_figs(filtered_df, filter_args)
     col1, col2 = st.columns(2)
     
     with col1:
-        score_cols = ['density_score', 'transit_score', 'income_score', 'education_score', 'housing_score']
-        avg_scores = filtered_df[score_cols].mean()
-        
-        fig_bar = px.bar(
-            x=score_cols,
-            y=avg_scores.values,
-            title="Average Scores by Component",
-            labels={'x': 'Score Component', 'y': 'Average Score'},
-            color=avg_scores.values,
-            color_continuous_scale='Viridis'
-        )
-        fig_bar.update_layout(showlegend=False)
         st.plotly_chart(fig_bar, use_container_width=True)
     
     with col2:
         # Score correlation heatmap
-        score_df = filtered_df[['composite_score', 'density_score', 'transit_score', 
-                                'income_score', 'education_score', 'housing_score']]
-        corr_matrix = score_df.corr()
-        
-        fig_heatmap = px.imshow(
-            corr_matrix,
-            labels=dict(color="Correlation"),
-            x=corr_matrix.columns,
-            y=corr_matrix.columns,
-            color_continuous_scale='RdBu',
-            aspect="auto",
-            title="Score Components Correlation Matrix"
-        )
         st.plotly_chart(fig_heatmap, use_container_width=True)
     
     # Scatter plot: Composite score vs individual scores
@@ -239,7 +512,8 @@ with tab2:
                                             'income_score', 'education_score', 'housing_score'], key='y_score')
     
     fig_scatter = px.scatter(
-        filtered_df,
+        subsample(filtered_df),
+        render_mode='webgl',
         x=score_x,
         y=score_y,
         color='score_category',
@@ -251,43 +525,45 @@ with tab2:
     )
     st.plotly_chart(fig_scatter, use_container_width=True)
 
-with tab3:
+@st.fragment
+def render_economic_metrics(filtered_df, filter_args):
     st.header("Economic Metrics")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Median income distribution
-        fig_income = px.histogram(
-            filtered_df,
-            x='median_income',
-            nbins=30,
+        fig_income = hist_fig(
+            *hist_bins(filtered_df, filter_args, 'median_income'),
             title="Median Income Distribution",
-            labels={'median_income': 'Median Income ($)', 'count': 'Number of Zip Codes'},
-            color_discrete_sequence=['#2ca02c']
+            x_label='Median Income ($)',
+            color='#2ca02c'
         )
         st.plotly_chart(fig_income, use_container_width=True)
     
     with col2:
         # Median home value distribution
-        fig_home = px.histogram(
-            filtered_df,
-            x='median_home_value',
-            nbins=30,
+        fig_home = hist_fig(
+            *hist_bins(filtered_df, filter_args, 'median_home_value'),
             title="Median Home Value Distribution",
-            labels={'median_home_value': 'Median Home Value ($)', 'count': 'Number of Zip Codes'},
-            color_discrete_sequence=['#ff7f0e']
+            x_label='Median Home Value ($)',
+            color='#ff7f0e'
         )
         st.plotly_chart(fig_home, use_container_width=True)
     
     # Income vs Home Value
+    income_home_df, size_col, hover_cols = scatter_points(
+        filtered_df, 'median_income', 'median_home_value', 'composite_score',
+        'estimated_population', ['zip_code', 'primary_city', 'score_category']
+    )
     fig_income_home = px.scatter(
-        filtered_df,
+        income_home_df,
+        render_mode='webgl',
         x='median_income',
         y='median_home_value',
         color='composite_score',
-        size='estimated_population',
-        hover_data=['zip_code', 'primary_city', 'score_category'],
+        size=size_col,
+        hover_data=hover_cols,
         title="Median Income vs Median Home Value",
         labels={'median_income': 'Median Income ($)',
                 'median_home_value': 'Median Home Value ($)',
@@ -301,60 +577,47 @@ with tab3:
     
     with col1:
         st.subheader("Top Cities by Average Income")
-        city_income = filtered_df.groupby('primary_city')['median_income'].mean().sort_values(ascending=False).head(10)
-        fig_city_income = px.bar(
-            x=city_income.values,
-            y=city_income.index,
-            orientation='h',
+        fig_city_income = top_city_fig(
+            filtered_df, filter_args, 'median_income',
             title="Top 10 Cities by Average Median Income",
-            labels={'x': 'Average Median Income ($)', 'y': 'City'},
-            color=city_income.values,
-            color_continuous_scale='Greens'
+            x_label='Average Median Income ($)',
+            color_scale='Greens'
         )
-        fig_city_income.update_layout(showlegend=False)
         st.plotly_chart(fig_city_income, use_container_width=True)
     
     with col2:
         st.subheader("Top Cities by Average Home Value")
-        city_home = filtered_df.groupby('primary_city')['median_home_value'].mean().sort_values(ascending=False).head(10)
-        fig_city_home = px.bar(
-            x=city_home.values,
-            y=city_home.index,
-            orientation='h',
+        fig_city_home = top_city_fig(
+            filtered_df, filter_args, 'median_home_value',
             title="Top 10 Cities by Average Home Value",
-            labels={'x': 'Average Home Value ($)', 'y': 'City'},
-            color=city_home.values,
-            color_continuous_scale='Oranges'
+            x_label='Average Home Value ($)',
+            color_scale='Oranges'
         )
-        fig_city_home.update_layout(showlegend=False)
         st.plotly_chart(fig_city_home, use_container_width=True)
 
-with tab4:
+@st.fragment
+def render_demographics(filtered_df, filter_args):
     st.header("Demographics & Location Metrics")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Population distribution
-        fig_pop = px.histogram(
-            filtered_df,
-            x='estimated_population',
-            nbins=30,
+        fig_pop = hist_fig(
+            *hist_bins(filtered_df, filter_args, 'estimated_population'),
             title="Population Distribution",
-            labels={'estimated_population': 'Estimated Population', 'count': 'Number of Zip Codes'},
-            color_discrete_sequence=['#9467bd']
+            x_label='Estimated Population',
+            color='#9467bd'
         )
         st.plotly_chart(fig_pop, use_container_width=True)
     
     with col2:
         # Population density distribution
-        fig_density = px.histogram(
-            filtered_df,
-            x='population_density',
-            nbins=30,
+        fig_density = hist_fig(
+            *hist_bins(filtered_df, filter_args, 'population_density'),
             title="Population Density Distribution",
-            labels={'population_density': 'Population Density', 'count': 'Number of Zip Codes'},
-            color_discrete_sequence=['#8c564b']
+            x_label='Population Density',
+            color='#8c564b'
         )
         st.plotly_chart(fig_density, use_container_width=True)
     
@@ -362,35 +625,36 @@ with tab4:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_transit = px.histogram(
-            filtered_df,
-            x='public_transit_pct',
-            nbins=30,
+        fig_transit = hist_fig(
+            *hist_bins(filtered_df, filter_args, 'public_transit_pct'),
             title="Public Transit Usage Distribution",
-            labels={'public_transit_pct': 'Public Transit Usage (%)', 'count': 'Number of Zip Codes'},
-            color_discrete_sequence=['#e377c2']
+            x_label='Public Transit Usage (%)',
+            color='#e377c2'
         )
         st.plotly_chart(fig_transit, use_container_width=True)
     
     with col2:
-        fig_education = px.histogram(
-            filtered_df,
-            x='education_pct',
-            nbins=30,
+        fig_education = hist_fig(
+            *hist_bins(filtered_df, filter_args, 'education_pct'),
             title="Education Level Distribution",
-            labels={'education_pct': 'Education Level (%)', 'count': 'Number of Zip Codes'},
-            color_discrete_sequence=['#7f7f7f']
+            x_label='Education Level (%)',
+            color='#7f7f7f'
         )
         st.plotly_chart(fig_education, use_container_width=True)
     
     # Scatter: Population vs Density
+    pop_density_df, size_col, hover_cols = scatter_points(
+        filtered_df, 'estimated_population', 'population_density', 'composite_score',
+        'median_income', ['zip_code', 'primary_city', 'score_category']
+    )
     fig_pop_density = px.scatter(
-        filtered_df,
+        pop_density_df,
+        render_mode='webgl',
         x='estimated_population',
         y='population_density',
         color='composite_score',
-        size='median_income',
-        hover_data=['zip_code', 'primary_city', 'score_category'],
+        size=size_col,
+        hover_data=hover_cols,
         title="Population vs Population Density",
         labels={'estimated_population': 'Estimated Population',
                 'population_density': 'Population Density',
@@ -399,7 +663,8 @@ with tab4:
     )
     st.plotly_chart(fig_pop_density, use_container_width=True)
 
-with tab5:
+@st.fragment
+def render_map(filtered_df, filter_args):
     st.header("🗺️ Interactive California Map")
     
     # Map visualization options
@@ -421,22 +686,15 @@ with tab5:
         )
     
     # Filter out rows with missing coordinates
-    map_df = filtered_df[filtered_df['latitude'].notna() & filtered_df['longitude'].notna()].copy()
+    map_df = filtered_df[filtered_df['latitude'].notna() & filtered_df['longitude'].notna()]
     
     if len(map_df) > 0:
-        # Create hover text
-        map_df['hover_text'] = (
-            '<b>Zip Code:</b> ' + map_df['zip_code'].astype(str) + '<br>' +
-            '<b>City:</b> ' + map_df['primary_city'] + '<br>' +
-            '<b>Composite Score:</b> ' + map_df['composite_score'].round(2).astype(str) + '<br>' +
-            '<b>Score Category:</b> ' + map_df['score_category'] + '<br>' +
-            '<b>Median Income:</b> $' + map_df['median_income'].apply(lambda x: f"{x:,.0f}") + '<br>' +
-            '<b>Home Value:</b> $' + map_df['median_home_value'].apply(lambda x: f"{x:,.0f}") + '<br>' +
-            '<b>Population:</b> ' + map_df['estimated_population'].apply(lambda x: f"{x:,.0f}")
-        )
-        
-        # Create the map
-        if map_color_by == 'score_category':
+        # Create the map; dense selections are rasterized instead of drawn per point
+        fig_map = None
+        if len(map_df) > MAP_RASTER_MIN_POINTS:
+            fig_map = raster_map_fig(map_df, map_color_by)
+        rasterized = fig_map is not None
+        if fig_map is None and map_color_by == 'score_category':
             # Use discrete colors for categories
             fig_map = px.scatter_mapbox(
                 map_df,
@@ -444,16 +702,7 @@ with tab5:
                 lon='longitude',
                 color=map_color_by,
                 size=map_size_by,
-                hover_name='primary_city',
-                hover_data={
-                    'zip_code': True,
-                    'composite_score': ':.2f',
-                    'median_income': ':$,.0f',
-                    'median_home_value': ':$,.0f',
-                    'latitude': False,
-                    'longitude': False
-                },
-                custom_data=['zip_code', 'primary_city', 'composite_score', 'median_income', 'median_home_value'],
+                custom_data=MAP_HOVER_COLS,
                 title="LA County Zip Codes on California Map",
                 zoom=8,
                 height=700,
@@ -461,7 +710,7 @@ with tab5:
                 size_max=20,
                 opacity=0.7
             )
-        else:
+        elif fig_map is None:
             # Use continuous colors for numeric values
             fig_map = px.scatter_mapbox(
                 map_df,
@@ -469,16 +718,7 @@ with tab5:
                 lon='longitude',
                 color=map_color_by,
                 size=map_size_by,
-                hover_name='primary_city',
-                hover_data={
-                    'zip_code': True,
-                    'composite_score': ':.2f',
-                    'median_income': ':$,.0f',
-                    'median_home_value': ':$,.0f',
-                    'latitude': False,
-                    'longitude': False
-                },
-                custom_data=['zip_code', 'primary_city', 'composite_score', 'median_income', 'median_home_value'],
+                custom_data=MAP_HOVER_COLS,
                 title="LA County Zip Codes on California Map",
                 zoom=8,
                 height=700,
@@ -488,6 +728,9 @@ with tab5:
                 opacity=0.7
             )
         
+        # Hover text is formatted in the browser from customdata
+        fig_map.update_traces(hovertemplate=MAP_HOVER_TEMPLATE)
+        
         # Update map layout
         fig_map.update_layout(
             mapbox_style="open-street-map",
@@ -513,48 +756,73 @@ with tab5:
             st.metric("Coverage", f"{(len(map_df)/len(filtered_df)*100):.1f}%")
         
         # Instructions
-        st.info("💡 **Tip**: Hover over markers to see detailed information. Use the map controls to zoom and pan. Click on the legend to filter by category.")
+        if rasterized:
+            st.info(
+                f"💡 **Tip**: More than {MAP_RASTER_MIN_POINTS:,} zip codes are selected, so the map is "
+                "shown as a density image without hover details, legend or marker sizes. "
+                "Narrow the filters to see individual markers."
+            )
+        else:
+            st.info("💡 **Tip**: Hover over markers to see detailed information. Use the map controls to zoom and pan. Click on the legend to filter by category.")
     else:
         st.warning("No data points with valid coordinates found for the selected filters.")
 
-with tab6:
+@st.fragment
+def render_data_table(filtered_df, filter_args):
     st.header("Data Table")
     
     # Search functionality
     search_term = st.text_input("🔍 Search (zip code, city, etc.)", "")
     
-    if search_term:
-        mask = (
-            filtered_df['zip_code'].astype(str).str.contains(search_term, case=False, na=False) |
-            filtered_df['primary_city'].str.contains(search_term, case=False, na=False) |
-            filtered_df['score_category'].str.contains(search_term, case=False, na=False)
-        )
-        display_df = filtered_df[mask]
-    else:
-        display_df = filtered_df.copy()
-    
     # Column selection
     default_cols = ['zip_code', 'primary_city', 'composite_score', 'score_category', 
                     'median_income', 'median_home_value', 'estimated_population']
-    available_cols = filtered_df.columns.tolist()
+    available_cols = [c for c in filtered_df.columns if not c.startswith('__')]
     selected_cols = st.multiselect(
         "Select columns to display",
         available_cols,
         default=default_cols
     )
     
-    if selected_cols:
-        display_df = display_df[selected_cols]
+    # Select rows and displayed columns in one step
+    display_cols = selected_cols or available_cols
+    if search_term:
+        search = filtered_df['__search']
+        if search_term.isdigit():
+            # Numeric searches are zip code prefixes; the zip leads the search text
+            mask = search.str.startswith(search_term, na=False)
+        else:
+            mask = search.str.contains(search_term.lower(), regex=False, na=False)
+        display_df = filtered_df.loc[mask, display_cols]
+    else:
+        display_df = filtered_df[display_cols]
+    
+    # Paginate on the server so only the visible page is sent to the browser
+    n_pages = max(1, -(-len(display_df) // TABLE_PAGE_SIZE))
+    # Keyed on what produced the rows, so a new result set starts on page 1
+    page = int(st.number_input(
+        "Page",
+        min_value=1,
+        max_value=n_pages,
+        value=1,
+        step=1,
+        key=f"table_page_{hash((filter_args, search_term))}"
+    ))
+    start = (page - 1) * TABLE_PAGE_SIZE
+    st.caption(
+        f"Page {page} of {n_pages} · rows {min(start + 1, len(display_df)):,}"
+        f"–{min(start + TABLE_PAGE_SIZE, len(display_df)):,} of {len(display_df):,}"
+    )
     
     # Display dataframe
     st.dataframe(
-        display_df,
+        display_df.iloc[start:start + TABLE_PAGE_SIZE],
         use_container_width=True,
         height=600
     )
     
     # Download button
-    csv = display_df.to_csv(index=False)
+    csv = view_csv_bytes(display_df, filter_args, search_term, tuple(selected_cols))
     st.download_button(
         label="📥 Download filtered data as CSV",
         data=csv,
@@ -563,10 +831,83 @@ with tab6:
     )
     
     # Summary statistics
-    st.subheader("Summary Statistics")
-    numeric_cols = display_df.select_dtypes(include=['float64', 'int64']).columns
-    if len(numeric_cols) > 0:
-        st.dataframe(display_df[numeric_cols].describe(), use_container_width=True)
+    with st.expander("Summary Statistics", expanded=False):
+        summary = describe_view(display_df, filter_args, search_term, tuple(selected_cols))
+        if summary is not None:
+            st.dataframe(summary, use_container_width=True)
+
+df = get_dashboard_data()
+
+# Sidebar filters
+st.sidebar.header("🔍 Filters")
+
+score_categories, cities, min_score, max_score = get_sidebar_options(df)
+
+# Score category filter
+selected_category = st.sidebar.selectbox("Score Category", score_categories)
+
+# City filter
+selected_city = st.sidebar.selectbox("Primary City", cities)
+
+# Composite score range
+score_range = st.sidebar.slider(
+    "Composite Score Range",
+    min_value=min_score,
+    max_value=max_score,
+    value=(min_score, max_score)
+)
+
+# Apply filters
+filter_args = (selected_category, selected_city, score_range[0], score_range[1])
+# Keep the filtered frame in session state so reruns reuse it without pickling
+if st.session_state.get('filter_args') != filter_args:
+    st.session_state.filtered_df = get_filtered(df, *filter_args)
+    st.session_state.filter_args = filter_args
+filtered_df = st.session_state.filtered_df
+
+# Main title
+st.title("🏙️ Los Angeles County Zip Code Analysis Dashboard")
+st.markdown("---")
+
+# Key Metrics
+key_means = filter_aggregates(filtered_df, filter_args)['metric_means']
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    st.metric("Total Zip Codes", len(filtered_df))
+with col2:
+    st.metric("Avg Composite Score", f"{key_means['composite_score']:.2f}")
+with col3:
+    st.metric("Avg Median Income", f"${key_means['median_income']:,.0f}")
+with col4:
+    st.metric("Avg Home Value", f"${key_means['median_home_value']:,.0f}")
+with col5:
+    st.metric("Avg Population", f"{key_means['estimated_population']:,.0f}")
+
+st.markdown("---")
+
+# Views for different analyses; only the selected view's body runs
+views = [
+    "📊 Overview", 
+    "📈 Score Analysis", 
+    "💰 Economic Metrics", 
+    "🏘️ Demographics", 
+    "🗺️ Interactive Map",
+    "📋 Data Table"
+]
+view = st.radio("View", views, horizontal=True, label_visibility="collapsed", key='view')
+
+if view == "📊 Overview":
+    render_overview(filtered_df, filter_args)
+elif view == "📈 Score Analysis":
+    render_score_analysis(filtered_df, filter_args)
+elif view == "💰 Economic Metrics":
+    render_economic_metrics(filtered_df, filter_args)
+elif view == "🏘️ Demographics":
+    render_demographics(filtered_df, filter_args)
+elif view == "🗺️ Interactive Map":
+    render_map(filtered_df, filter_args)
+elif view == "📋 Data Table":
+    render_data_table(filtered_df, filter_args)
 
 # Footer
 st.markdown("---")
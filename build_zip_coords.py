@@ -0,0 +1,39 @@
+"""Build la_zip_coords.json, the static zip code coordinates table used by app.py.
+
+Run once wherever pgeocode can download its postal code data, then commit the
+generated file:
+
+    python build_zip_coords.py
+"""
+import json
+import os
+
+import pandas as pd
+import pgeocode
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    zips = pd.read_csv(
+        os.path.join(here, 'LA_County_Analysis_Final_with_Scores.csv'),
+        usecols=['zip_code']
+    )['zip_code'].unique()
+    locations = pgeocode.Nominatim('us').query_postal_code([str(int(z)).zfill(5) for z in zips])
+
+    # Zip codes pgeocode cannot place are kept as nulls so app.py still
+    # treats the table as covering them
+    table = {
+        str(int(zip_code)): [
+            None if pd.isna(lat) else round(float(lat), 6),
+            None if pd.isna(lon) else round(float(lon), 6)
+        ]
+        for zip_code, lat, lon in zip(zips, locations['latitude'], locations['longitude'])
+    }
+    with open(os.path.join(here, 'la_zip_coords.json'), 'w') as f:
+        json.dump(table, f, indent=1, sort_keys=True)
+    print(f"Wrote coordinates for {len(table)} zip codes")
+
+
+if __name__ == '__main__':
+    main()